@@ -5,13 +5,18 @@ This file provide binding to the libgdf library.
 """
 import ctypes
 import contextlib
+import functools
 import itertools
+import threading
+import weakref
+from collections import OrderedDict
 
 import numpy as np
 import pandas as pd
 import pyarrow as pa
 
 from numba import cuda
+from numba.cuda.cudadrv.drvapi import API_PROTOTYPES
 
 from libgdf_cffi import ffi, libgdf
 from . import cudautils
@@ -76,7 +81,10 @@ def columnview(size, data, mask=None, dtype=None, null_count=None):
     def unwrap(buffer):
         if buffer is None:
             return ffi.NULL
-        assert buffer.mem.is_c_contiguous(), "libGDF expects contiguous memory"
+        assert buffer.is_contiguous(), "libGDF expects contiguous memory"
+        if hasattr(buffer.mem, 'device_ctypes_pointer'):
+            # Same start address as .to_gpu_array() but without slicing
+            return unwrap_devary(buffer.mem)
         devary = buffer.to_gpu_array()
         return unwrap_devary(devary)
 
@@ -87,6 +95,14 @@ def columnview(size, data, mask=None, dtype=None, null_count=None):
                        dtype=dtype, null_count=null_count)
 
 
+def _cffi_view_array(columns):
+    """Make a C array of ``gdf_column*`` from the cffi views of *columns*.
+
+    The array does not own the views; they are kept alive by the columns.
+    """
+    return ffi.new('gdf_column*[]', [col.cffi_view for col in columns])
+
+
 def apply_binaryop(binop, lhs, rhs, out):
     """Apply binary operator *binop* to operands *lhs* and *rhs*.
     The result is stored to *out*.
@@ -97,10 +113,18 @@ def apply_binaryop(binop, lhs, rhs, out):
     # apply binary operator
     binop(*args)
     # validity mask
-    if out.has_null_mask:
-        return apply_mask_and(lhs, rhs, out)
-    else:
+    if not out.has_null_mask:
+        return 0
+    elif lhs.null_count == 0 and rhs.null_count == 0:
         return 0
+    elif lhs.null_count == 0 or rhs.null_count == 0:
+        # Only one operand has nulls; its mask is the result mask.
+        src = rhs if lhs.null_count == 0 else lhs
+        nbytes = calc_chunk_size(len(out), mask_bitsize)
+        out.mask.mem[:nbytes].copy_to_device(src.mask.mem[:nbytes])
+        return src.null_count
+    else:
+        return apply_mask_and(lhs, rhs, out)
 
 
 def apply_unaryop(unaop, inp, out):
@@ -128,55 +152,129 @@ np_gdf_dict = {np.float64: libgdf.GDF_FLOAT64,
                np.bool_:   libgdf.GDF_INT8,
                np.datetime64: libgdf.GDF_DATE64}
 
+# Same mapping keyed by the numpy type number (``dtype.num``), which is much
+# cheaper to look up than ``dtype.type``.
+_np_gdf_by_num = {np.dtype(k).num: v for k, v in np_gdf_dict.items()}
+
+_gdf_np_dict = {
+    libgdf.GDF_FLOAT64: np.dtype(np.float64),
+    libgdf.GDF_FLOAT32: np.dtype(np.float32),
+    libgdf.GDF_INT64: np.dtype(np.int64),
+    libgdf.GDF_INT32: np.dtype(np.int32),
+    libgdf.GDF_INT16: np.dtype(np.int16),
+    libgdf.GDF_INT8: np.dtype(np.int8),
+    libgdf.GDF_DATE64: np.dtype(np.datetime64),
+    libgdf.N_GDF_TYPES: np.dtype(np.int32),
+    libgdf.GDF_CATEGORY: np.dtype(np.int32),
+}
+
 
 def np_to_gdf_dtype(dtype):
     """Util to convert numpy dtype to gdf dtype.
     """
-    if pd.api.types.is_categorical_dtype(dtype):
+    if isinstance(dtype, np.dtype):
+        return _np_gdf_by_num[dtype.num]
+    elif pd.api.types.is_categorical_dtype(dtype):
         return libgdf.GDF_INT8
     else:
-        return np_gdf_dict[np.dtype(dtype).type]
+        return _np_gdf_by_num[np.dtype(dtype).num]
 
 
 def gdf_to_np_dtype(dtype):
     """Util to convert gdf dtype to numpy dtype.
     """
-    return np.dtype({
-         libgdf.GDF_FLOAT64: np.float64,
-         libgdf.GDF_FLOAT32: np.float32,
-         libgdf.GDF_INT64: np.int64,
-         libgdf.GDF_INT32: np.int32,
-         libgdf.GDF_INT16: np.int16,
-         libgdf.GDF_INT8: np.int8,
-         libgdf.GDF_DATE64: np.datetime64,
-         libgdf.N_GDF_TYPES: np.int32,
-         libgdf.GDF_CATEGORY: np.int32,
-     }[dtype])
+    return _gdf_np_dict[dtype]
+
+
+np_pa_dict = {
+    np.float64:     pa.float64(),
+    np.float32:     pa.float32(),
+    np.int64:       pa.int64(),
+    np.int32:       pa.int32(),
+    np.int16:       pa.int16(),
+    np.int8:        pa.int8(),
+    np.bool_:       pa.int8(),
+    np.datetime64:  pa.date64(),
+}
+
+_np_pa_by_num = {np.dtype(k).num: v for k, v in np_pa_dict.items()}
 
 
 def np_to_pa_dtype(dtype):
     """Util to convert numpy dtype to PyArrow dtype.
     """
-    return {
-        np.float64:     pa.float64(),
-        np.float32:     pa.float32(),
-        np.int64:       pa.int64(),
-        np.int32:       pa.int32(),
-        np.int16:       pa.int16(),
-        np.int8:        pa.int8(),
-        np.bool_:       pa.int8(),
-        np.datetime64:  pa.date64(),
-    }[np.dtype(dtype).type]
+    return _np_pa_by_num[np.dtype(dtype).num]
+
+
+# Pool of small scratch device arrays keyed by (context, size, dtype).
+# Reusing them avoids a cuMemAlloc/cuMemFree pair for every reduction and
+# segmented sort.  The pool is bounded: least recently used keys are evicted
+# and arrays larger than _DEVBUF_POOL_MAX_BYTES are never retained.  It is
+# shared by all threads and guarded by _DEVBUF_POOL_LOCK.
+_DEVBUF_POOL = OrderedDict()
+_DEVBUF_POOL_LOCK = threading.Lock()
+_DEVBUF_POOL_MAX_KEYS = 32
+_DEVBUF_POOL_MAX_PER_KEY = 4
+_DEVBUF_POOL_MAX_BYTES = 1 << 20
+
+
+def _borrow_device_array(size, dtype):
+    """Get a 1D device array of *size* and *dtype* in the current context
+    from the pool, allocating a new one if none is available.  The content
+    is undefined.
+    """
+    key = (cuda.current_context(), size, np.dtype(dtype))
+    with _DEVBUF_POOL_LOCK:
+        freelist = _DEVBUF_POOL.get(key)
+        if freelist:
+            _DEVBUF_POOL.move_to_end(key)
+            return freelist.pop()
+    return cuda.device_array(size, dtype=dtype)
+
+
+def _return_device_array(arr):
+    """Give back an array obtained from ``_borrow_device_array``.  Must be
+    called in the context the array was borrowed in.
+    """
+    if arr.size * arr.dtype.itemsize > _DEVBUF_POOL_MAX_BYTES:
+        return
+    key = (cuda.current_context(), arr.size, arr.dtype)
+    with _DEVBUF_POOL_LOCK:
+        freelist = _DEVBUF_POOL.setdefault(key, [])
+        _DEVBUF_POOL.move_to_end(key)
+        if len(freelist) < _DEVBUF_POOL_MAX_PER_KEY:
+            freelist.append(arr)
+        while len(_DEVBUF_POOL) > _DEVBUF_POOL_MAX_KEYS:
+            _DEVBUF_POOL.popitem(last=False)
+
+
+# Per-thread pinned host buffer for reading back reduction results.
+# Allocated on first use so that importing does not touch the GPU.
+_reduce_hostbuf = threading.local()
+
+
+def _get_reduce_hostbuf():
+    try:
+        return _reduce_hostbuf.ary
+    except AttributeError:
+        ary = _reduce_hostbuf.ary = cuda.pinned_array(16, dtype=np.uint8)
+        return ary
 
 
 def apply_reduce(fn, inp):
     # allocate output+temp array
     outsz = libgdf.gdf_reduce_optimal_output_size()
-    out = cuda.device_array(outsz, dtype=inp.dtype)
-    # call reduction
-    fn(inp.cffi_view, unwrap_devary(out), outsz)
-    # return 1st element
-    return out[0]
+    out = _borrow_device_array(outsz, dtype=inp.dtype)
+    try:
+        # call reduction
+        fn(inp.cffi_view, unwrap_devary(out), outsz)
+        # return 1st element, copied through pinned memory
+        itemsize = out.dtype.itemsize
+        hostbuf = _get_reduce_hostbuf()
+        cuda.driver.device_to_host(hostbuf, out, itemsize)
+        return hostbuf[:itemsize].view(out.dtype)[0]
+    finally:
+        _return_device_array(out)
 
 
 def apply_sort(col_keys, col_vals, ascending=True):
@@ -208,59 +306,192 @@ _join_method_api = {
     'hash': libgdf.GDF_HASH
 }
 
+# Cache of gdf_context* keyed by (flag_sorted, flag_method).  Contexts hold
+# no per-call state, so they are shared by all joins with the same settings.
+_CONTEXT_CACHE = {}
+
+
+def _get_context(sort_result, method_api):
+    """Get a cached ``gdf_context*`` for the given settings.
+    """
+    key = (sort_result, method_api)
+    gdf_context = _CONTEXT_CACHE.get(key)
+    if gdf_context is None:
+        gdf_context = ffi.new('gdf_context*')
+        libgdf.gdf_context_view(gdf_context, sort_result, method_api, 0)
+        _CONTEXT_CACHE[key] = gdf_context
+    return gdf_context
+
+
+class _MemFinalizer(object):
+    """Memory finalizer for externally allocated memory.
 
-def _make_mem_finalizer(dtor, bytesize):
-    """Make memory finalizer for externally allocated memory
+    Calling it queues *handle* for release by *dtor* in the deallocations
+    of *context*.
     """
-    def mem_finalize(context, handle):
-        deallocations = context.deallocations
+    __slots__ = ['deallocations', 'dtor', 'handle', 'bytesize']
 
-        def core():
-            deallocations.add_item(dtor, handle, size=bytesize)
+    def __init__(self, context, dtor, handle, bytesize):
+        self.deallocations = context.deallocations
+        self.dtor = dtor
+        self.handle = handle
+        self.bytesize = bytesize
 
-        return core
+    def __call__(self):
+        self.deallocations.add_item(self.dtor, self.handle,
+                                    size=self.bytesize)
 
-    return mem_finalize
 
+# Stream-ordered cuMemFreeAsync needs a CUDA 11.2 driver and a device that
+# supports memory pools.  Memory freed this way is released when the
+# per-context stream reaches the free instead of synchronizing the device as
+# cuMemFree does.
+_MEMFREE_ASYNC_MIN_DRIVER_VERSION = 11020
+_CU_DEVICE_ATTRIBUTE_MEMORY_POOLS_SUPPORTED = 115
+_mem_dtors = {}
 
-def _as_numba_devarray(intaddr, nelem, dtype, cb_dtor=None):
+
+def _memfree_async_supported(ctx):
+    """Whether cuMemFreeAsync can be used for memory in *ctx*.
+    """
+    # Check the prototypes rather than the lazy driver object: older numba
+    # raises KeyError for unknown names and newer numba returns a stub for
+    # names missing from libcuda.
+    if not all(name in API_PROTOTYPES
+               for name in ('cuMemFreeAsync', 'cuDriverGetVersion',
+                            'cuDeviceGetAttribute')):
+        return False
+    driver = cuda.driver.driver
+    version = ctypes.c_int()
+    driver.cuDriverGetVersion(ctypes.byref(version))
+    if version.value < _MEMFREE_ASYNC_MIN_DRIVER_VERSION:
+        return False
+    supported = ctypes.c_int()
+    driver.cuDeviceGetAttribute(ctypes.byref(supported),
+                                _CU_DEVICE_ATTRIBUTE_MEMORY_POOLS_SUPPORTED,
+                                ctx.device.id)
+    return bool(supported.value)
+
+
+def _get_mem_dtor(ctx):
+    """Get the function used to release libgdf allocations in *ctx*.
+    """
+    try:
+        return _mem_dtors[ctx]
+    except KeyError:
+        driver = cuda.driver.driver
+        if _memfree_async_supported(ctx):
+            stream = cuda.stream()
+
+            def dtor(handle):
+                driver.cuMemFreeAsync(handle, stream.handle)
+        else:
+            dtor = driver.cuMemFree
+        _mem_dtors[ctx] = dtor
+        return dtor
+
+
+class _CudaArrayInterface(object):
+    """Expose a 1D C-contiguous device allocation through
+    ``__cuda_array_interface__``.
+
+    ``cuda.as_cuda_array()`` wraps it without copying and keeps the instance
+    alive as the owner of the memory for as long as any array or slice
+    refers to it.  The *size*, *dtype* and *device_ctypes_pointer*
+    attributes mirror those of a numba device array so that callers only
+    needing the pointer (e.g. ``unwrap_devary``) can skip the wrapping.
+    """
+    def __init__(self, intaddr, nelem, dtype):
+        self.size = nelem
+        self.dtype = dtype
+        self.device_ctypes_pointer = ctypes.c_void_p(intaddr)
+        self.__cuda_array_interface__ = {
+            'shape': (nelem,),
+            'strides': None,
+            'typestr': dtype.str,
+            'data': (intaddr, False),
+            'version': 2,
+        }
+
+
+@functools.lru_cache(maxsize=32)
+def _device_memory_wrapper(dtype, has_dtor):
+    """Make a function that wraps device memory of *dtype* as a numba device
+    array.  The dtype is normalized once here instead of on every call.
+
+    The returned function takes ``(intaddr, nelem, cb_dtor, ctx)``; the
+    last two are only used if *has_dtor*.
+    """
     # Handle Datetime Column
     if dtype == np.datetime64:
         dtype = np.dtype('datetime64[ms]')
     else:
         dtype = np.dtype(dtype)
-    addr = ctypes.c_uint64(intaddr)
-    elemsize = dtype.itemsize
-    datasize = elemsize * nelem
-    finalizer = (_make_mem_finalizer(cb_dtor, datasize))
-    ctx = cuda.current_context()
-    if cb_dtor is None:
-        memptr = cuda.driver.MemoryPointer(context=ctx,
-                                           pointer=addr, size=datasize,
-                                           )
+    itemsize = dtype.itemsize
+
+    def wrap_null(nelem, ctx):
+        # numba < 0.49 queries the driver for any pointer passed through
+        # __cuda_array_interface__, which fails for NULL.  Wrap it directly;
+        # there is nothing to free.
+        memptr = cuda.driver.MemoryPointer(context=ctx or
+                                           cuda.current_context(),
+                                           pointer=ctypes.c_uint64(0),
+                                           size=itemsize * nelem)
+        return cuda.devicearray.DeviceNDArray(shape=(nelem,),
+                                              strides=(itemsize,),
+                                              dtype=dtype, gpu_data=memptr)
+
+    if has_dtor:
+        def wrap(intaddr, nelem, cb_dtor, ctx):
+            if intaddr == 0:
+                return wrap_null(nelem, ctx)
+            owner = _CudaArrayInterface(intaddr, nelem, dtype)
+            weakref.finalize(owner, _MemFinalizer(ctx, cb_dtor,
+                                                  ctypes.c_uint64(intaddr),
+                                                  itemsize * nelem))
+            return cuda.as_cuda_array(owner)
     else:
-        memptr = cuda.driver.MemoryPointer(context=ctx,
-                                           pointer=addr, size=datasize,
-                                           finalizer=finalizer(ctx, addr)
-                                           )
-    return cuda.devicearray.DeviceNDArray(shape=(nelem,), strides=(elemsize,),
-                                          dtype=dtype, gpu_data=memptr)
+        def wrap(intaddr, nelem, cb_dtor=None, ctx=None):
+            if intaddr == 0:
+                return wrap_null(nelem, ctx)
+            return cuda.as_cuda_array(_CudaArrayInterface(intaddr, nelem,
+                                                          dtype))
+    return wrap
+
+
+def _wrap_device_memory(intaddr, nelem, dtype, cb_dtor=None, ctx=None):
+    """Wrap externally allocated device memory as a numba device array.
+
+    If *cb_dtor* is given, it is queued for deallocation of the memory once
+    no array refers to it anymore.  *ctx* is the CUDA context owning the
+    memory; it defaults to the current context.  Callers wrapping many
+    allocations should look it up once and pass it in.
+    """
+    has_dtor = cb_dtor is not None
+    if has_dtor and ctx is None:
+        ctx = cuda.current_context()
+    wrap = _device_memory_wrapper(dtype, has_dtor)
+    return wrap(intaddr, nelem, cb_dtor, ctx)
 
 
 def cffi_view_to_column_mem(cffi_view):
-    data = _as_numba_devarray(intaddr=int(ffi.cast("uintptr_t",
-                                                   cffi_view.data)),
-                              nelem=cffi_view.size,
-                              dtype=gdf_to_np_dtype(cffi_view.dtype),
-                              cb_dtor=cuda.driver.driver.cuMemFree)
+    ctx = cuda.current_context()
+    dtor = _get_mem_dtor(ctx)
+    data = _wrap_device_memory(intaddr=int(ffi.cast("uintptr_t",
+                                                    cffi_view.data)),
+                               nelem=cffi_view.size,
+                               dtype=gdf_to_np_dtype(cffi_view.dtype),
+                               cb_dtor=dtor,
+                               ctx=ctx)
 
     if cffi_view.valid:
-        mask = _as_numba_devarray(intaddr=int(ffi.cast("uintptr_t",
-                                              cffi_view.valid)),
-                                  nelem=calc_chunk_size(cffi_view.size,
-                                                        mask_bitsize),
-                                  dtype=mask_dtype,
-                                  cb_dtor=cuda.driver.driver.cuMemFree)
+        mask = _wrap_device_memory(intaddr=int(ffi.cast("uintptr_t",
+                                                        cffi_view.valid)),
+                                   nelem=calc_chunk_size(cffi_view.size,
+                                                         mask_bitsize),
+                                   dtype=mask_dtype,
+                                   cb_dtor=dtor,
+                                   ctx=ctx)
     else:
         mask = None
 
@@ -269,7 +500,9 @@ def cffi_view_to_column_mem(cffi_view):
 
 @contextlib.contextmanager
 def apply_join(col_lhs, col_rhs, how, method='hash'):
-    """Returns a tuple of the left and right joined indices as gpu arrays.
+    """Returns a tuple of the left and right joined indices as objects
+    exposing ``__cuda_array_interface__``.  They are only valid inside the
+    context.
     """
     if(len(col_lhs) != len(col_rhs)):
         msg = "Unequal #columns in list 'col_lhs' and list 'col_rhs'"
@@ -277,12 +510,11 @@ def apply_join(col_lhs, col_rhs, how, method='hash'):
 
     joiner = _join_how_api[how]
     method_api = _join_method_api[method]
-    gdf_context = ffi.new('gdf_context*')
 
     if method == 'hash':
-        libgdf.gdf_context_view(gdf_context, 0, method_api, 0)
+        gdf_context = _get_context(0, method_api)
     elif method == 'sort':
-        libgdf.gdf_context_view(gdf_context, 1, method_api, 0)
+        gdf_context = _get_context(1, method_api)
     else:
         msg = "method not supported"
         raise ValueError(msg)
@@ -291,31 +523,30 @@ def apply_join(col_lhs, col_rhs, how, method='hash'):
     col_result_r = columnview(0, None, dtype=np.int32)
 
     if(how in ['left', 'inner']):
-        list_lhs = []
-        list_rhs = []
-        for i in range(len(col_lhs)):
-            list_lhs.append(col_lhs[i].cffi_view)
-            list_rhs.append(col_rhs[i].cffi_view)
+        arr_lhs = _cffi_view_array(col_lhs)
+        arr_rhs = _cffi_view_array(col_rhs)
 
         # Call libgdf
 
-        joiner(len(col_lhs), list_lhs, list_rhs, col_result_l,
+        joiner(len(col_lhs), arr_lhs, arr_rhs, col_result_l,
                col_result_r, gdf_context)
     else:
         joiner(col_lhs[0].cffi_view, col_rhs[0].cffi_view, col_result_l,
                col_result_r)
 
     # Extract result
+    # The memory is owned by the result columns, which are freed on exit;
+    # callers wrap the indices with cuda.as_cuda_array() when needed.
 
-    # yield ((ary[0], ary[1]) if datasize > 0 else (ary, ary))
-
-    left = _as_numba_devarray(intaddr=int(ffi.cast("uintptr_t",
-                                                   col_result_l.data)),
-                              nelem=col_result_l.size, dtype=np.int32)
+    left = _CudaArrayInterface(intaddr=int(ffi.cast("uintptr_t",
+                                                    col_result_l.data)),
+                               nelem=col_result_l.size,
+                               dtype=np.dtype(np.int32))
 
-    right = _as_numba_devarray(intaddr=int(ffi.cast("uintptr_t",
-                                                    col_result_r.data)),
-                               nelem=col_result_r.size, dtype=np.int32)
+    right = _CudaArrayInterface(intaddr=int(ffi.cast("uintptr_t",
+                                                     col_result_r.data)),
+                                nelem=col_result_r.size,
+                                dtype=np.dtype(np.int32))
 
     yield(left, right)
 
@@ -326,54 +557,51 @@ def apply_join(col_lhs, col_rhs, how, method='hash'):
 def libgdf_join(col_lhs, col_rhs, on, how, method='sort'):
     joiner = _join_how_api[how]
     method_api = _join_method_api[method]
-    gdf_context = ffi.new('gdf_context*')
-
-    libgdf.gdf_context_view(gdf_context, 0, method_api, 0)
+    gdf_context = _get_context(0, method_api)
 
     if how not in ['left', 'inner']:
         msg = "new join api only supports left or inner"
         raise ValueError(msg)
 
-    list_lhs = []
-    list_rhs = []
-    result_cols = []
+    lhs_columns = [col._column for col in col_lhs.values()]
+    rhs_columns = [col._column for col in col_rhs.values()]
+    lhs_pos = {name: i for i, name in enumerate(col_lhs)}
+    rhs_pos = {name: i for i, name in enumerate(col_rhs)}
 
+    result_cols = []
     result_col_names = []
 
-    left_idx = []
-    right_idx = []
-    # idx = 0
-    for name, col in col_lhs.items():
-        list_lhs.append(col._column.cffi_view)
+    # Result columns are ordered as: left (not in *on*), *on*, right (not
+    # in *on*).
+    for name, col in zip(col_lhs, lhs_columns):
         if name not in on:
-            result_cols.append(columnview(0, None, dtype=col._column.dtype))
+            result_cols.append(columnview(0, None, dtype=col.dtype))
             result_col_names.append(name)
 
     for name in on:
         result_cols.append(columnview(0, None,
                                       dtype=col_lhs[name]._column.dtype))
         result_col_names.append(name)
-        left_idx.append(list(col_lhs.keys()).index(name))
-        right_idx.append(list(col_rhs.keys()).index(name))
+    left_idx = ffi.new('int[]', [lhs_pos[name] for name in on])
+    right_idx = ffi.new('int[]', [rhs_pos[name] for name in on])
 
-    for name, col in col_rhs.items():
-        list_rhs.append(col._column.cffi_view)
+    for name, col in zip(col_rhs, rhs_columns):
         if name not in on:
-            result_cols.append(columnview(0, None, dtype=col._column.dtype))
+            result_cols.append(columnview(0, None, dtype=col.dtype))
             result_col_names.append(name)
 
     num_cols_to_join = len(on)
-    result_num_cols = len(list_lhs) + len(list_rhs) - num_cols_to_join
+    result_num_cols = len(lhs_columns) + len(rhs_columns) - num_cols_to_join
 
-    joiner(list_lhs,
-           len(list_lhs),
+    joiner(_cffi_view_array(lhs_columns),
+           len(lhs_columns),
            left_idx,
-           list_rhs,
-           len(list_rhs),
+           _cffi_view_array(rhs_columns),
+           len(rhs_columns),
            right_idx,
            num_cols_to_join,
            result_num_cols,
-           result_cols,
+           ffi.new('gdf_column*[]', result_cols),
            ffi.NULL,
            ffi.NULL,
            gdf_context)
@@ -381,18 +609,16 @@ def libgdf_join(col_lhs, col_rhs, on, how, method='sort'):
     res = []
     valids = []
 
+    ctx = cuda.current_context()
+    dtor = _get_mem_dtor(ctx)
+    wrap_mask = _device_memory_wrapper(mask_dtype, True)
     for col in result_cols:
-        res.append(_as_numba_devarray(intaddr=int(ffi.cast("uintptr_t",
-                                                           col.data)),
-                                      nelem=col.size,
-                                      dtype=gdf_to_np_dtype(col.dtype),
-                                      cb_dtor=cuda.driver.driver.cuMemFree))
-        valids.append(_as_numba_devarray(intaddr=int(ffi.cast("uintptr_t",
-                                                              col.valid)),
-                                         nelem=calc_chunk_size(col.size,
-                                                               mask_bitsize),
-                                         dtype=mask_dtype,
-                                         cb_dtor=cuda.driver.driver.cuMemFree))
+        wrap_data = _device_memory_wrapper(gdf_to_np_dtype(col.dtype), True)
+        res.append(wrap_data(int(ffi.cast("uintptr_t", col.data)),
+                             col.size, dtor, ctx))
+        valids.append(wrap_mask(int(ffi.cast("uintptr_t", col.valid)),
+                                calc_chunk_size(col.size, mask_bitsize),
+                                dtor, ctx))
 
     return res, valids
 
@@ -456,27 +682,59 @@ class SegmentedRadixortPlan(object):
         seg_dtype = np.uint32
         segsize_limit = 2 ** 16 - 1
 
-        d_fullsegs = cuda.device_array(segments.size + 1, dtype=seg_dtype)
-        d_begins = d_fullsegs[:-1]
-        d_ends = d_fullsegs[1:]
-
-        # Note: .astype is required below because .copy_to_device
-        #       is just a plain memcpy
-        d_begins.copy_to_device(cudautils.astype(segments, dtype=seg_dtype))
-        d_ends[-1:].copy_to_device(np.require([self.nelem], dtype=seg_dtype))
-
-        # The following is to handle the segument size limit due to
-        # max CUDA grid size.
-        range0 = range(0, segments.size, segsize_limit)
-        range1 = itertools.chain(range0[1:], [segments.size])
-        for s, e in zip(range0, range1):
-            segsize = e - s
-            libgdf.gdf_segmented_radixsort_generic(self.plan,
-                                                   col_keys.cffi_view,
-                                                   col_vals.cffi_view,
-                                                   segsize,
-                                                   unwrap_devary(d_begins[s:]),
-                                                   unwrap_devary(d_ends[s:]))
+        d_fullsegs = _borrow_device_array(segments.size + 1, dtype=seg_dtype)
+        try:
+            d_begins = d_fullsegs[:-1]
+            d_ends = d_fullsegs[1:]
+
+            if segments.dtype == seg_dtype:
+                d_begins.copy_to_device(segments)
+            elif segments.size > 0:
+                # Note: .copy_to_device is just a plain memcpy; cast
+                #       elementwise into *d_begins* instead of through a
+                #       temporary array.
+                cudautils.gpu_copy.forall(segments.size)(segments, d_begins)
+            d_ends[-1:].copy_to_device(np.require([self.nelem],
+                                                  dtype=seg_dtype))
+
+            # The following is to handle the segument size limit due to
+            # max CUDA grid size.
+            range0 = range(0, segments.size, segsize_limit)
+            range1 = itertools.chain(range0[1:], [segments.size])
+            # Offset raw pointers per tile instead of slicing the device arrays
+            begins_ptr = d_begins.device_ctypes_pointer.value
+            ends_ptr = d_ends.device_ctypes_pointer.value
+            itemsize = np.dtype(seg_dtype).itemsize
+            keys_view = col_keys.cffi_view
+            vals_view = col_vals.cffi_view
+            for s, e in zip(range0, range1):
+                segsize = e - s
+                offset = s * itemsize
+                libgdf.gdf_segmented_radixsort_generic(
+                    self.plan,
+                    keys_view,
+                    vals_view,
+                    segsize,
+                    ffi.cast('void*', begins_ptr + offset),
+                    ffi.cast('void*', ends_ptr + offset))
+        finally:
+            _return_device_array(d_fullsegs)
+
+
+# Per-thread one-element gdf_column* arrays, reused when hashing a single
+# column.  Each caller uses its own *slot* so that arrays needed by the
+# same libgdf call do not alias.
+_single_column_arrays = threading.local()
+
+
+def _single_column_array(slot, column):
+    try:
+        arr = getattr(_single_column_arrays, slot)
+    except AttributeError:
+        arr = ffi.new('gdf_column*[1]')
+        setattr(_single_column_arrays, slot, arr)
+    arr[0] = column.cffi_view
+    return arr
 
 
 def hash_columns(columns, result):
@@ -488,9 +746,12 @@ def hash_columns(columns, result):
     # No-op for 0-sized
     if len(result) == 0:
         return result
-    col_input = [col.cffi_view for col in columns]
+    if len(columns) == 1:
+        col_input = _single_column_array('hash_input', columns[0])
+    else:
+        col_input = _cffi_view_array(columns)
     col_out = result.cffi_view
-    ncols = len(col_input)
+    ncols = len(columns)
     hashfn = libgdf.GDF_HASH_MURMUR3
     libgdf.gdf_hash(ncols, col_input, hashfn, col_out)
     return result
@@ -514,13 +775,19 @@ def hash_partition(input_columns, key_indices, nparts, output_columns):
     """
     assert len(input_columns) == len(output_columns)
 
-    col_inputs = [col.cffi_view for col in input_columns]
-    col_outputs = [col.cffi_view for col in output_columns]
+    if len(input_columns) == 1:
+        col_inputs = _single_column_array('partition_input',
+                                          input_columns[0])
+        col_outputs = _single_column_array('partition_output',
+                                           output_columns[0])
+    else:
+        col_inputs = _cffi_view_array(input_columns)
+        col_outputs = _cffi_view_array(output_columns)
     offsets = ffi.new('int[]', nparts)
     hashfn = libgdf.GDF_HASH_MURMUR3
 
     libgdf.gdf_hash_partition(
-        len(col_inputs),
+        len(input_columns),
         col_inputs,
         key_indices,
         len(key_indices),
@@ -534,12 +801,39 @@ def hash_partition(input_columns, key_indices, nparts, output_columns):
     return offsets
 
 
+# Masks of at least this many bits are counted with the popc kernel in
+# cudautils; smaller ones are not worth the kernel launch and go to libgdf.
+_COUNT_NONZERO_KERNEL_MIN_BITS = 1 << 16
+
+
+# Per-thread ``int*`` output cell reused by count_nonzero_mask
+_nnz_scratch = threading.local()
+
+
+def _get_nnz_scratch():
+    try:
+        return _nnz_scratch.cell
+    except AttributeError:
+        cell = _nnz_scratch.cell = ffi.new('int*')
+        return cell
+
+
 def count_nonzero_mask(mask, size):
     assert mask.size * mask_bitsize >= size
-    nnz = ffi.new('int*')
-    nnz[0] = 0
     mask_ptr, addr = unwrap_mask(mask)
 
+    if (addr != ffi.NULL and size >= _COUNT_NONZERO_KERNEL_MIN_BITS and
+            addr % np.dtype(np.uint64).itemsize == 0):
+        # View the complete 64-bit words of the mask as uint64
+        nwords = size // 64
+        words = _wrap_device_memory(addr, nwords, np.uint64)
+        tail = mask[nwords * 8:calc_chunk_size(size, mask_bitsize)]
+        return cudautils.count_nonzero_mask_words(words, tail,
+                                                  size - nwords * 64)
+
+    nnz = _get_nnz_scratch()
+    nnz[0] = 0
+
     if addr != ffi.NULL:
         libgdf.gdf_count_nonzero_mask(mask_ptr, size, nnz)
 
@@ -563,6 +857,15 @@ def str_to_gdf_color(s):
     return _GDF_COLORS[s.lower()]
 
 
+@functools.lru_cache(maxsize=256)
+def _nvtx_name(name):
+    """Get the encoded C string for an NVTX range name.
+
+    Cached so that repeatedly pushed ranges do not allocate a new buffer.
+    """
+    return ffi.new("char[]", name.encode('ascii'))
+
+
 def nvtx_range_push(name, color='green'):
     """
     Demarcate the beginning of a user-defined NVTX range.
@@ -575,7 +878,7 @@ def nvtx_range_push(name, color='green'):
         The color to use for the range.
         Can be named color or hex RGB string.
     """
-    name_c = ffi.new("char[]", name.encode('ascii'))
+    name_c = _nvtx_name(name)
 
     try:
         color = int(color, 16)  # only works if color is a hex string
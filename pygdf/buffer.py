@@ -37,6 +37,8 @@ class Buffer(object):
         self.size = size
         self.capacity = capacity
         self.dtype = self.mem.dtype
+        # *mem* is never replaced, so its layout can be checked once
+        self._is_c_contig = self.mem.is_c_contiguous()
 
     def serialize(self, serialize, context=None):
         """Called when dask.distributed is performing a serialization on this
@@ -184,7 +186,7 @@ class Buffer(object):
         return out
 
     def is_contiguous(self):
-        return self.mem.is_c_contiguous()
+        return self._is_c_contig
 
 
 class BufferSentryError(ValueError):
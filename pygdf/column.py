@@ -35,6 +35,8 @@ class Column(object):
     These attributes are exported in the properties (e.g. *data*, *mask*,
     *null_count*).
     """
+    _cached_cffi_view = None
+
     @classmethod
     def _concat(cls, objs):
         head = objs[0]
@@ -184,12 +186,28 @@ class Column(object):
     @property
     def cffi_view(self):
         """LibGDF CFFI view
+
+        The view is built on first access and reused while it still
+        describes this column.  It is rebuilt if the data buffer was resized
+        (e.g. by ``Buffer.extend``) or if libgdf wrote different *size* or
+        *null_count* into it.
         """
-        return _gdf.columnview(size=self._data.size,
-                               data=self._data,
-                               mask=self._mask,
-                               dtype=self.dtype,
-                               null_count=self._null_count)
+        view = self._cached_cffi_view
+        if (view is None or view.size != self._data.size or
+                view.null_count != self._null_count):
+            view = _gdf.columnview(size=self._data.size,
+                                   data=self._data,
+                                   mask=self._mask,
+                                   dtype=self.dtype,
+                                   null_count=self._null_count)
+            self._cached_cffi_view = view
+        return view
+
+    def __getstate__(self):
+        # The cached cffi view cannot be pickled
+        state = self.__dict__.copy()
+        state.pop('_cached_cffi_view', None)
+        return state
 
     def set_mask(self, mask, null_count=None):
         """Create new Column by setting the mask
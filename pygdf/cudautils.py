@@ -2,7 +2,7 @@
 
 import numpy as np
 
-from numba import cuda, int32, numpy_support
+from numba import cuda, int32, int64, uint64, numpy_support
 from math import isnan
 
 from .utils import mask_bitsize, mask_get, mask_set, make_mask
@@ -298,6 +298,58 @@ def mask_from_devary(ary):
         gpu_mask_from_devary.forall(bits.size)(ary, bits)
     return bits
 
+
+# Count set bits in a bitmask
+
+COUNT_BITS_BLOCKSIZE = 256
+
+
+@cuda.jit
+def gpu_count_nonzero_mask_words(words, tail, tail_bits, out):
+    """Count the set bits of *words* (uint64) plus the low *tail_bits* bits
+    of the bytes in *tail*, accumulating the total into *out[0]*.
+
+    Note: run with blocks of COUNT_BITS_BLOCKSIZE threads.
+    """
+    tid = cuda.threadIdx.x
+    count = int64(0)
+    for i in range(cuda.grid(1), words.size, cuda.gridsize(1)):
+        count += int64(cuda.popc(words[i]))
+    # The trailing bits that do not fill a complete word
+    if cuda.grid(1) == 0:
+        for j in range(tail.size):
+            nbits = min(tail_bits - j * 8, 8)
+            byte = int64(tail[j]) & ((int64(1) << nbits) - 1)
+            count += int64(cuda.popc(byte))
+    # Reduce within the warp
+    offset = 16
+    while offset > 0:
+        count += cuda.shfl_xor_sync(0xffffffff, count, offset)
+        offset //= 2
+    # Reduce across warps
+    warp_sums = cuda.shared.array(COUNT_BITS_BLOCKSIZE // 32, dtype=int64)
+    if tid % 32 == 0:
+        warp_sums[tid // 32] = count
+    cuda.syncthreads()
+    if tid == 0:
+        total = int64(0)
+        for w in range(COUNT_BITS_BLOCKSIZE // 32):
+            total += warp_sums[w]
+        cuda.atomic.add(out, 0, uint64(total))
+
+
+def count_nonzero_mask_words(words, tail, tail_bits):
+    """Count the set bits in a bitmask split into complete uint64 *words* and
+    the *tail* bytes holding the remaining *tail_bits* bits.
+    """
+    out = cuda.device_array(1, dtype=np.uint64)
+    cuda.driver.device_memset(out, 0, out.dtype.itemsize)
+    nblocks = optimal_block_count(
+        (words.size + COUNT_BITS_BLOCKSIZE - 1) // COUNT_BITS_BLOCKSIZE)
+    gpu_count_nonzero_mask_words[nblocks, COUNT_BITS_BLOCKSIZE](
+        words, tail, tail_bits, out)
+    return int(out.copy_to_host()[0])
+
 #
 # Gather
 #
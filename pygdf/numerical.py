@@ -276,6 +276,8 @@ class NumericalColumn(columnops.TypedColumnBase):
         with _gdf.apply_join(
                 [self], [other], how=how, method='hash') as (lidx, ridx):
             if lidx.size > 0:
+                lidx = cuda.as_cuda_array(lidx)
+                ridx = cuda.as_cuda_array(ridx)
                 raw_index = cudautils.gather_joined_index(
                         self.to_gpu_array(),
                         other.to_gpu_array(),
@@ -324,6 +326,8 @@ class NumericalColumn(columnops.TypedColumnBase):
         with _gdf.apply_join(
                 [lkey], [rkey], how=how, method='sort') as (lidx, ridx):
             if lidx.size > 0:
+                lidx = cuda.as_cuda_array(lidx)
+                ridx = cuda.as_cuda_array(ridx)
                 raw_index = cudautils.gather_joined_index(
                         lkey.to_gpu_array(),
                         rkey.to_gpu_array(),
@@ -105,6 +105,28 @@ def test_validity_add(nelem):
     np.testing.assert_array_equal(expect, got)
 
 
+@pytest.mark.parametrize('nelem,masked_lhs',
+                         list(product([1, 7, 8, 9, 32, 64, 128],
+                                      [True, False])))
+def test_validity_add_one_side_masked(nelem, masked_lhs):
+    np.random.seed(0)
+    masked_data = np.random.random(nelem)
+    mask = utils.random_bitmask(nelem)
+    bitmask = utils.expand_bits_to_bytes(mask)[:nelem]
+    masked = Series.from_masked_array(masked_data, mask)
+    plain_data = np.random.random(nelem)
+    plain = Series(plain_data)
+    # Result
+    res = masked + plain if masked_lhs else plain + masked
+    assert res.null_count == utils.count_zero(bitmask)
+    # Fill NA values
+    na_value = -10000
+    got = res.fillna(na_value).to_array()
+    expect = masked_data + plain_data
+    expect[~np.asarray(bitmask, dtype=np.bool)] = na_value
+    np.testing.assert_array_equal(expect, got)
+
+
 _dtypes = [
     np.int32, np.int64,
     np.float32, np.float64,
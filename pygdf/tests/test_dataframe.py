@@ -499,6 +499,15 @@ def test_dataframe_setitem_from_masked_object():
     assert(test4['lst'].null_count == 2)
 
 
+@pytest.mark.parametrize('nelem', [2 ** 16 - 1, 2 ** 16, 2 ** 16 + 67])
+def test_null_count_large(nelem):
+    np.random.seed(0)
+    mask = utils.random_bitmask(nelem)
+    bitmask = utils.expand_bits_to_bytes(mask)[:nelem]
+    sr = Series.from_masked_array(np.random.random(nelem), mask)
+    assert sr.null_count == utils.count_zero(bitmask)
+
+
 def test_dataframe_append_to_empty():
     pdf = pd.DataFrame()
     pdf['a'] = []
@@ -228,6 +228,39 @@ def test_dataframe_join_mismatch_cats(how):
     assert list(got.index) == list(expect.index)
 
 
+@pytest.mark.parametrize('method', ['hash', 'sort'])
+def test_dataframe_join_no_match(method):
+    # libgdf returns NULL data and valid pointers for the empty result
+    df1 = DataFrame()
+    df1['a'] = [1, 2, 3]
+    df1['b'] = [1., 2., 3.]
+    df1 = df1.set_index('a')
+    df2 = DataFrame()
+    df2['c'] = [4, 5, 6]
+    df2['d'] = [4., 5., 6.]
+    df2 = df2.set_index('c')
+
+    got = df1.join(df2, how='inner', method=method)
+    expect = df1.to_pandas().join(df2.to_pandas(), how='inner')
+
+    assert len(got) == 0
+    assert list(got.columns) == list(expect.columns)
+
+
+def test_dataframe_merge_no_match():
+    left = DataFrame()
+    left['key'] = [1, 2, 3]
+    left['x'] = [1., 2., 3.]
+    right = DataFrame()
+    right['key'] = [4, 5, 6]
+    right['y'] = [4., 5., 6.]
+
+    got = left.merge(right, on=['key'], how='inner')
+
+    assert len(got) == 0
+    assert set(got.columns) == {'key', 'x', 'y'}
+
+
 def test_dataframe_multi_column_join():
     np.random.seed(0)
 
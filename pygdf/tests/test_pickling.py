@@ -7,7 +7,7 @@ import numpy as np
 from numba import cuda
 import pandas as pd
 
-from pygdf.dataframe import DataFrame, GenericIndex
+from pygdf.dataframe import DataFrame, GenericIndex, Series
 from pygdf.buffer import Buffer
 
 
@@ -74,6 +74,22 @@ def test_pickle_index():
     assert idx == out
 
 
+def assert_series_picklable(sr):
+    loaded = pickle.loads(pickle.dumps(sr))
+    np.testing.assert_equal(loaded.to_array(), sr.to_array())
+
+
+def test_pickle_series_after_libgdf_calls():
+    np.random.seed(0)
+    sr = Series(np.random.random(10))
+    # The operands of a binop have been passed to libgdf
+    res = sr + sr
+    assert_series_picklable(sr)
+    assert_series_picklable(res)
+    # The sorted column has been passed to libgdf's sort
+    assert_series_picklable(sr.sort_values())
+
+
 def test_pickle_buffer():
     arr = np.arange(10)
     buf = Buffer(arr, size=4, capacity=arr.size)